@@ -3,9 +3,67 @@ Fact-Checker Agent
 Single CodeAgent with tools for summarization and fact-checking
 """
 
+import queue
+from contextlib import contextmanager
+
 from smolagents import CodeAgent, PythonInterpreterTool, FinalAnswerTool, WikipediaSearchTool
+from smolagents.memory import ActionStep, FinalAnswerStep
+from smolagents.models import ChatMessageStreamDelta
 from config import get_model
-from tools import analyze_youtube_video, fetch_web_page, better_web_search
+from tools import analyze_youtube_video, fetch_web_page, better_web_search, fact_check_claims
+
+
+# Prompt templates. All static instructions come first and the URL last, so
+# every run shares the same prompt prefix and providers that cache prompt
+# prefixes can reuse it across requests.
+FACT_CHECK_PROMPT = """Analyze this content and provide both a summary and fact-checking.
+
+Tasks:
+1. Retrieve and read the content from the URL given below
+   - If YouTube: Use analyze_youtube_video tool
+   - Otherwise: Use fetch_web_page tool
+
+2. Create a concise summary (3-5 key points)
+
+3. Fact-check the content:
+   - Identify 3-5 verifiable factual claims
+   - Search for supporting or contradicting evidence for all claims in a single
+     fact_check_claims call (pass the full list; do not loop over claims)
+   - Use better_web_search only for follow-up queries on a specific claim
+   - Determine verdict: Supported, Contradicted, Mixed, or Unverified
+   - List sources used for verification
+
+Format your response as:
+## Summary
+[3-5 bullet points of key information]
+
+## Fact-Check Results
+[For each claim, provide:]
+- Claim: [The factual statement]
+- Verdict: [Supported/Contradicted/Mixed/Unverified]
+- Evidence: [Brief summary with source links]
+
+URL: {url}
+"""
+
+SUMMARY_PROMPT = """Analyze this content and provide a summary.
+
+Tasks:
+1. Retrieve and read the content from the URL given below
+   - If YouTube: Use analyze_youtube_video tool
+   - Otherwise: Use fetch_web_page tool
+
+2. Create a concise summary (3-5 key points) covering:
+   - Main topic/thesis
+   - Key arguments or information
+   - Important conclusions or takeaways
+
+Format your response as:
+## Summary
+[3-5 bullet points of key information]
+
+URL: {url}
+"""
 
 
 def create_fact_checker_agent():
@@ -24,6 +82,7 @@ def create_fact_checker_agent():
         analyze_youtube_video,     # YouTube transcript extraction
         fetch_web_page,            # Web article extraction
         better_web_search,         # Web search for fact-checking
+        fact_check_claims,         # Concurrent search for a batch of claims
         WikipediaSearchTool(),     # Wikipedia search for reliable reference information
         FinalAnswerTool(),         # Final answer formatting
     ]
@@ -34,12 +93,38 @@ def create_fact_checker_agent():
         model=model,
         max_steps=15,
         additional_authorized_imports=["json", "re"],
-        verbosity_level=1
+        verbosity_level=1,
+        stream_outputs=True,  # Emit model output token by token when run with stream=True
     )
 
     return agent
 
 
+# Idle agents ready for reuse. Building a CodeAgent (model client, tools,
+# Python executor) isn't free, but one agent can't serve two runs at once,
+# so each concurrent run checks out its own agent and returns it afterwards.
+_IDLE_AGENTS = queue.SimpleQueue()
+
+
+@contextmanager
+def _checkout_agent():
+    """Borrow an idle agent for a single run, creating one if none is free."""
+    try:
+        agent = _IDLE_AGENTS.get_nowait()
+    except queue.Empty:
+        agent = create_fact_checker_agent()
+    else:
+        # Memory is reset by agent.run(); also drop variables and functions
+        # left in the Python executor by the previous run's code
+        agent.python_executor.state = {"__name__": "__main__"}
+        agent.python_executor.custom_tools = {}
+
+    try:
+        yield agent
+    finally:
+        _IDLE_AGENTS.put(agent)
+
+
 def run_fact_checker(url: str, enable_fact_check: bool = False):
     """
     Run fact-checker agent on a given URL.
@@ -51,58 +136,44 @@ def run_fact_checker(url: str, enable_fact_check: bool = False):
     Returns:
         str: Agent's response
     """
-    agent = create_fact_checker_agent()
-
-    # Build prompt based on fact-check flag
-    if enable_fact_check:
-        prompt = f"""Analyze this content and provide both a summary and fact-checking:
-
-URL: {url}
-
-Tasks:
-1. Retrieve and read the content from the URL
-   - If YouTube: Use analyze_youtube_video tool
-   - Otherwise: Use fetch_web_page tool
-
-2. Create a concise summary (3-5 key points)
-
-3. Fact-check the content:
-   - Identify 3-5 verifiable factual claims
-   - For each claim, search for supporting or contradicting evidence using better_web_search
-   - Determine verdict: Supported, Contradicted, Mixed, or Unverified
-   - List sources used for verification
-
-Format your response as:
-## Summary
-[3-5 bullet points of key information]
-
-## Fact-Check Results
-[For each claim, provide:]
-- Claim: [The factual statement]
-- Verdict: [Supported/Contradicted/Mixed/Unverified]
-- Evidence: [Brief summary with source links]
-"""
-    else:
-        prompt = f"""Analyze this content and provide a summary:
+    prompt = _build_prompt(url, enable_fact_check)
 
-URL: {url}
+    # Run agent
+    with _checkout_agent() as agent:
+        result = agent.run(prompt, reset=True)
 
-Tasks:
-1. Retrieve and read the content from the URL
-   - If YouTube: Use analyze_youtube_video tool
-   - Otherwise: Use fetch_web_page tool
+    return result
 
-2. Create a concise summary (3-5 key points) covering:
-   - Main topic/thesis
-   - Key arguments or information
-   - Important conclusions or takeaways
 
-Format your response as:
-## Summary
-[3-5 bullet points of key information]
-"""
+def run_fact_checker_stream(url: str, enable_fact_check: bool = False):
+    """
+    Run fact-checker agent on a given URL, streaming its progress.
 
-    # Run agent
-    result = agent.run(prompt)
+    Args:
+        url: URL to analyze (YouTube video or web page)
+        enable_fact_check: Whether to perform fact-checking (default: False)
 
-    return result
+    Yields:
+        str: The model's output so far while the agent works, then the
+            agent's final response as the last item
+    """
+    prompt = _build_prompt(url, enable_fact_check)
+
+    with _checkout_agent() as agent:
+        text = ""
+        for event in agent.run(prompt, stream=True, reset=True):
+            if isinstance(event, ChatMessageStreamDelta):
+                if event.content:
+                    text += event.content
+                    yield text
+            elif isinstance(event, ActionStep):
+                # Separate the output of consecutive steps
+                text += "\n\n"
+            elif isinstance(event, FinalAnswerStep):
+                yield str(event.output)
+
+
+def _build_prompt(url: str, enable_fact_check: bool) -> str:
+    """Fill in the prompt template selected by the fact-check flag."""
+    template = FACT_CHECK_PROMPT if enable_fact_check else SUMMARY_PROMPT
+    return template.format(url=url)
@@ -4,22 +4,16 @@ Simple interface for summarizing and fact-checking web content
 """
 
 import os
-import re
 import tempfile
 from datetime import datetime
 import gradio as gr
-from agent import run_fact_checker
-from tools import _extract_video_id, _get_video_transcript, fetch_web_page
-
-
-def is_youtube_url(url: str) -> bool:
-    """Check if URL is a YouTube video."""
-    return bool(re.search(r'(youtube\.com|youtu\.be)', url))
+from agent import run_fact_checker_stream
+from tools import _extract_video_id, _write_transcript, fetch_web_page, is_youtube_url
 
 
 def process_url(url: str, enable_fact_check: bool, enable_download: bool, include_timestamps: bool):
     """
-    Process URL through fact-checker agent.
+    Process URL through fact-checker agent, streaming partial output.
 
     Args:
         url: URL to analyze
@@ -27,49 +21,52 @@ def process_url(url: str, enable_fact_check: bool, enable_download: bool, includ
         enable_download: Whether to generate downloadable text file
         include_timestamps: Whether to include timestamps (YouTube only)
 
-    Returns:
-        tuple: (analysis_result, download_file_path or None)
+    Yields:
+        tuple: (analysis_result so far, download_file_path or None); the
+            last item holds the final result and download file
     """
     if not url or not url.strip():
-        return "Please enter a URL to analyze.", None
+        yield "Please enter a URL to analyze.", None
+        return
 
     try:
-        # Run the analysis
-        result = run_fact_checker(url.strip(), enable_fact_check)
+        # Run the analysis, updating the output as the agent works
+        result = ""
+        for result in run_fact_checker_stream(url.strip(), enable_fact_check):
+            yield result, None
 
         # Generate download file if requested
         download_file = None
         if enable_download:
             try:
                 is_youtube = is_youtube_url(url.strip())
+                temp_dir = tempfile.gettempdir()
 
                 if is_youtube:
-                    # Extract YouTube transcript
+                    # Stream YouTube transcript straight to a temporary file
                     video_id = _extract_video_id(url.strip())
-                    transcript_text = _get_video_transcript(video_id, include_timestamps=include_timestamps)
-                    filename = f"transcript_{video_id}.txt"
+                    file_path = os.path.join(temp_dir, f"transcript_{video_id}.txt")
+                    _write_transcript(video_id, include_timestamps, file_path)
                 else:
                     # Fetch web page content
-                    transcript_text = fetch_web_page(url.strip())
+                    page_text = fetch_web_page(url.strip())
                     # Create filename from timestamp
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = f"webpage_{timestamp}.txt"
+                    file_path = os.path.join(temp_dir, f"webpage_{timestamp}.txt")
 
-                # Save to temporary file
-                temp_dir = tempfile.gettempdir()
-                file_path = os.path.join(temp_dir, filename)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(transcript_text)
+                    # Save to temporary file
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        f.write(page_text)
 
                 download_file = file_path
             except Exception as e:
                 # Don't fail the whole process if download fails
                 result += f"\n\n[Note: Could not generate download file: {str(e)}]"
 
-        return result, download_file
+        yield result, download_file
 
     except Exception as e:
-        return f"Error processing URL: {str(e)}\n\nPlease check that:\n1. The URL is valid\n2. Environment variables are set (OPENROUTER_API_KEY, SERPER_API_KEY)", None
+        yield f"Error processing URL: {str(e)}\n\nPlease check that:\n1. The URL is valid\n2. Environment variables are set (OPENROUTER_API_KEY, SERPER_API_KEY)", None
 
 
 # Create Gradio interface
@@ -172,5 +169,10 @@ with gr.Blocks(title="Fact-Checker") as demo:
         outputs=[output, download_file]
     )
 
+# Let several users run analyses at once instead of one at a time. Gradio
+# runs the (sync) handlers in worker threads, so blocking HTTP and LLM calls
+# don't stall the server; each concurrent run gets its own agent.
+demo.queue(default_concurrency_limit=4, max_size=32)
+
 if __name__ == "__main__":
     demo.launch()
@@ -1,6 +1,6 @@
 """
 Configuration for Fact-Checker Agent
-OpenRouter-only setup for MVP
+OpenRouter by default, or a self-hosted vLLM server when VLLM_BASE_URL is set
 """
 
 import os
@@ -12,14 +12,21 @@ load_dotenv()
 
 def get_model():
     """
-    Initialize and return OpenRouter model via LiteLLM.
+    Initialize and return the agent's model via LiteLLM.
+
+    If VLLM_BASE_URL is set, the model is served by a local vLLM
+    OpenAI-compatible endpoint; otherwise requests go through OpenRouter.
 
     Returns:
         LiteLLMModel: Configured model for agent
 
     Raises:
-        ValueError: If OPENROUTER_API_KEY is not set
+        ValueError: If neither VLLM_BASE_URL nor OPENROUTER_API_KEY is set
     """
+    vllm_base_url = os.getenv("VLLM_BASE_URL")
+    if vllm_base_url:
+        return get_local_model(vllm_base_url)
+
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         raise ValueError(
@@ -42,6 +49,35 @@ def get_model():
     return model
 
 
+def get_local_model(api_base: str):
+    """
+    Initialize a model served by a vLLM OpenAI-compatible endpoint.
+
+    vLLM batches decode steps across concurrent requests, so several app
+    users can share one GPU. Start it with prefix caching enabled so the
+    shared prompt prefix is reused across runs, e.g.:
+
+        vllm serve meta-llama/Llama-3.1-8B-Instruct \\
+            --enable-prefix-caching --max-num-batched-tokens 8192
+
+    Args:
+        api_base: Base URL of the server (e.g. http://localhost:8000/v1)
+
+    Returns:
+        LiteLLMModel: Configured model for agent
+    """
+    # Use openai/ prefix to tell LiteLLM to speak the OpenAI API to api_base
+    model_id = os.getenv("LOCAL_MODEL", "meta-llama/Llama-3.1-8B-Instruct")
+    model_id = f"openai/{model_id}"
+
+    return LiteLLMModel(
+        model_id=model_id,
+        api_base=api_base,
+        api_key="EMPTY",  # vLLM doesn't check the key unless started with --api-key
+        timeout=120
+    )
+
+
 def get_serper_api_key():
     """
     Get Serper API key for web search.
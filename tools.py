@@ -5,40 +5,106 @@ Reused from course_final_ass with minimal modifications for MVP
 
 import os
 import re
-import json
+import hashlib
+import logging
+from functools import cache
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from urllib.parse import urlparse
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
-import html2text
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
+from diskcache import Cache
+import tiktoken
 import yt_dlp
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
 
 from smolagents import tool
 
 
+logger = logging.getLogger(__name__)
+
+# On-disk cache for transcripts, video metadata, page text and searches, shared
+# across runs so repeat URLs skip the network entirely
+CACHE_DIR = os.getenv("FACTAGENT_CACHE_DIR", os.path.expanduser("~/.factagent_cache"))
+CACHE_EXPIRE = 24 * 60 * 60  # seconds
+_CACHE = Cache(CACHE_DIR)
+
+# Shared HTTP session: keeps TCP/TLS connections alive across tool calls
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    # Browser-like User-Agent to avoid 403 errors on web pages
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        connect=1,  # Safe: the request never reached the server
+        read=0,  # Don't resend after a read timeout (slow pages, billed searches)
+        backoff_factor=0.3,
+        # Don't let the remote server pick how long we sleep (Retry-After can
+        # be hours, and the request timeout doesn't cover it); use backoff only
+        respect_retry_after_header=False,
+        status_forcelist=[429, 502, 503],
+        allowed_methods=frozenset({"GET", "POST"}),  # Serper searches are safe to retry
+        raise_on_status=False,  # Hand back the last response; callers check status
+    ),
+))
+
+
 # ============================================================================
 # YOUTUBE VIDEO ANALYSIS
 # ============================================================================
 
+_YT_URL_RE = re.compile(r'youtube\.com|youtu\.be')
+
+# Video ID from watch/short/embed URLs, or from a watch URL with v= not first
+_YT_ID_RE = re.compile(
+    r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\?/]+)'
+    r'|youtube\.com/watch\?.*v=([^&]+)'
+)
+
+
+def is_youtube_url(url: str) -> bool:
+    """Check if URL is a YouTube video."""
+    return bool(_YT_URL_RE.search(url))
+
+
 def _extract_video_id(url: str) -> str:
     """Extract YouTube video ID from various URL formats."""
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/)([^&\?/]+)',
-        r'youtube\.com/watch\?.*v=([^&]+)'
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    match = _YT_ID_RE.search(url)
+    if match:
+        return match.group(1) or match.group(2)
 
     raise ValueError(f"Could not extract video ID from URL: {url}")
 
 
+@_CACHE.memoize(expire=CACHE_EXPIRE)
+def _get_video_oembed(video_id: str) -> dict:
+    """Fetch basic video info (title, uploader) with one oEmbed request."""
+    response = _SESSION.get(
+        "https://www.youtube.com/oembed",
+        params={'url': f"https://youtu.be/{video_id}", 'format': 'json'},
+        timeout=30,
+    )
+    response.raise_for_status()
+    info = response.json()
+
+    return {
+        'title': info.get('title', 'Unknown'),
+        'uploader': info.get('author_name', 'Unknown'),
+    }
+
+
+@_CACHE.memoize(expire=CACHE_EXPIRE)
 def _get_video_metadata(video_id: str) -> dict:
-    """Fetch video metadata using yt-dlp."""
+    """Fetch full video metadata using yt-dlp (slow: several YouTube requests)."""
     ydl_opts = {
         'quiet': True,
         'no_warnings': True,
@@ -62,16 +128,30 @@ def _get_video_metadata(video_id: str) -> dict:
         }
 
 
-def _get_video_transcript(video_id: str, include_timestamps: bool = True) -> str:
+def _format_transcript_lines(entries, include_timestamps: bool = True):
+    """Yield one formatted line per transcript entry ("[mm:ss], text" or just text)."""
+    if not include_timestamps:
+        return (entry.text for entry in entries)
+
+    return (
+        f"[{minutes:02d}:{seconds:02d}], {entry.text}"
+        for entry in entries
+        for minutes, seconds in (divmod(int(entry.start), 60),)
+    )
+
+
+@_CACHE.memoize(expire=CACHE_EXPIRE)
+def _get_transcript_entries(video_id: str):
     """
-    Fetch video transcript using youtube-transcript-api.
+    Fetch video transcript entries using youtube-transcript-api.
+
+    Cached per video, so both timestamp formats share one download.
 
     Args:
         video_id: YouTube video ID
-        include_timestamps: If True, format as "[mm:ss], text". If False, text only.
 
     Returns:
-        Formatted transcript string
+        Iterable of transcript entries (each with .start and .text)
     """
     try:
         api = YouTubeTranscriptApi()
@@ -80,30 +160,14 @@ def _get_video_transcript(video_id: str, include_timestamps: bool = True) -> str
         try:
             transcript = transcript_list.find_transcript(['en'])
         except NoTranscriptFound:
-            # Fall back to any available transcript
-            available_languages = list(transcript_list._manually_created_transcripts.keys()) + \
-                                list(transcript_list._generated_transcripts.keys())
-            if available_languages:
-                transcript = transcript_list.find_transcript([available_languages[0]])
-            else:
-                raise NoTranscriptFound(f"No transcripts available for video {video_id}")
+            # Fall back to the first available transcript (manually created
+            # ones are listed before generated ones)
+            transcript = next(iter(transcript_list), None)
+            if transcript is None:
+                raise
 
         # Fetch the transcript entries
-        entries = transcript.fetch()
-
-        # Format with or without timestamps
-        formatted_lines = []
-        for entry in entries:
-            if include_timestamps:
-                timestamp = entry.start
-                minutes = int(timestamp // 60)
-                seconds = int(timestamp % 60)
-                text = entry.text
-                formatted_lines.append(f"[{minutes:02d}:{seconds:02d}], {text}")
-            else:
-                formatted_lines.append(entry.text)
-
-        return '\n'.join(formatted_lines)
+        return transcript.fetch()
 
     except TranscriptsDisabled:
         raise Exception(f"Transcripts are disabled for video {video_id}")
@@ -113,16 +177,54 @@ def _get_video_transcript(video_id: str, include_timestamps: bool = True) -> str
         raise Exception(f"Error fetching transcript: {str(e)}")
 
 
+def _get_video_transcript(video_id: str, include_timestamps: bool = True) -> str:
+    """
+    Fetch video transcript as a single string.
+
+    Args:
+        video_id: YouTube video ID
+        include_timestamps: If True, format as "[mm:ss], text". If False, text only.
+
+    Returns:
+        Formatted transcript string
+    """
+    entries = _get_transcript_entries(video_id)
+    return '\n'.join(_format_transcript_lines(entries, include_timestamps))
+
+
+def _write_transcript(video_id: str, include_timestamps: bool, file_path: str) -> None:
+    """
+    Write video transcript to a text file, one formatted line at a time.
+
+    Lines are streamed to the file instead of first building the whole
+    transcript string, so long transcripts don't double peak memory.
+
+    Args:
+        video_id: YouTube video ID
+        include_timestamps: If True, format as "[mm:ss], text". If False, text only.
+        file_path: Path of the file to (over)write
+    """
+    entries = _get_transcript_entries(video_id)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.writelines(
+            line + '\n' for line in _format_transcript_lines(entries, include_timestamps)
+        )
+
+
 @tool
-def analyze_youtube_video(url: str) -> str:
+def analyze_youtube_video(url: str, fetch_metadata: bool = False) -> str:
     """
     Extract transcript and metadata from YouTube video.
 
     Use this tool to analyze YouTube videos by fetching their transcripts
-    and metadata (title, description, duration, views, etc.).
+    and basic metadata (title, uploader). The transcript is usually all
+    that is needed for summarizing or fact-checking.
 
     Args:
         url: YouTube video URL (any standard format)
+        fetch_metadata: If True, also fetch full metadata (description,
+            duration, views, tags). This is slow, so only use it when
+            those details are needed.
 
     Returns:
         Formatted analysis including metadata and full transcript
@@ -131,26 +233,54 @@ def analyze_youtube_video(url: str) -> str:
         # Extract video ID
         video_id = _extract_video_id(url)
 
-        # Fetch metadata
-        metadata = _get_video_metadata(video_id)
+        # Fetch metadata and transcript concurrently (both are network-bound)
+        get_metadata = _get_video_metadata if fetch_metadata else _get_video_oembed
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            metadata_future = executor.submit(get_metadata, video_id)
+            transcript_future = executor.submit(_get_video_transcript, video_id)
+
+            try:
+                metadata = metadata_future.result()
+            except Exception as e:
+                if fetch_metadata:
+                    raise Exception(f"Error fetching video metadata: {str(e)}")
+
+                # Title/uploader are display-only, and oEmbed rejects some
+                # videos (e.g. embedding disabled) whose transcripts are fine
+                logger.info("oEmbed lookup failed for video %s: %s", video_id, e)
+                metadata = {'title': 'Unknown', 'uploader': 'Unknown'}
 
-        # Fetch transcript
-        transcript = _get_video_transcript(video_id)
+            # Already translated to a readable message by _get_video_transcript
+            transcript = transcript_future.result()
 
         # Format response
         response = f"""# Video Information
 Title: {metadata['title']}
 Uploader: {metadata['uploader']}
-Duration: {metadata['duration']} seconds
-Views: {metadata['view_count']:,}
+"""
+
+        if fetch_metadata:
+            # Only a short preview of the description and the first 10 tags
+            # are shown (yt-dlp may report any of these fields as None)
+            duration = metadata['duration'] or 0
+            view_count = metadata['view_count'] or 0
+            description = metadata['description'] or ''
+            if len(description) > 500:
+                description = description[:500] + '...'
+            tags = ', '.join(islice(metadata['tags'] or (), 10)) or 'None'
+
+            response += f"""Duration: {duration} seconds
+Views: {view_count:,}
 Upload Date: {metadata['upload_date']}
 
 ## Description
-{metadata['description'][:500]}{'...' if len(metadata['description']) > 500 else ''}
+{description}
 
 ## Tags
-{', '.join(metadata['tags'][:10]) if metadata['tags'] else 'None'}
+{tags}
+"""
 
+        response += f"""
 ## Full Transcript
 {transcript}
 """
@@ -167,10 +297,151 @@ Upload Date: {metadata['upload_date']}
 # WEB PAGE FETCHING
 # ============================================================================
 
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+# Maximum number of (decompressed) bytes read from a web page
+MAX_PAGE_BYTES = 512 * 1024
+
+# Maximum number of tokens of page text handed to the model
+MAX_PAGE_TOKENS = 6000
+
+# Character cap used instead when the tokenizer can't be loaded
+MAX_PAGE_CHARS = 20000
+
+_TRUNCATED_MARKER = "\n\n[Content truncated...]"
+
+# charset=... in a Content-Type header, or in a <meta> tag near the page start
+_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+# Elements dropped before text extraction
+_NON_CONTENT_SELECTOR = 'script,style,nav,footer,header,aside'
+
+# Inline elements unwrapped so their text stays on the same line as the
+# surrounding sentence instead of becoming a separate text node
+_INLINE_TAGS = [
+    'a', 'abbr', 'b', 'cite', 'code', 'em', 'i', 'mark', 'q', 's',
+    'small', 'span', 'strong', 'sub', 'sup', 'time', 'u',
+]
+
+
+@cache
+def _get_encoding():
+    """
+    Load the tokenizer used to measure page text, or None if unavailable.
+
+    tiktoken downloads the encoding on first use. A failed load is cached
+    too, so later pages don't retry the download.
+    """
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("Could not load tokenizer, truncating pages by characters: %s", e)
+        return None
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to at most max_tokens tokens, marking it if truncated.
+
+    Falls back to cutting at MAX_PAGE_CHARS characters if the tokenizer
+    can't be loaded.
+    """
+    # Each byte-level BPE token covers at least one UTF-8 byte, so text with
+    # no more bytes than max_tokens always fits
+    if len(text.encode('utf-8')) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    if encoding is None:
+        if len(text) <= MAX_PAGE_CHARS:
+            return text
+        return text[:MAX_PAGE_CHARS] + _TRUNCATED_MARKER
+
+    # Page text is data, so special-token strings are encoded as plain text
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+
+    # The cut can land inside a multi-byte character; drop that partial tail
+    truncated = encoding.decode_bytes(tokens[:max_tokens]).decode('utf-8', errors='ignore')
+    return truncated + _TRUNCATED_MARKER
+
+
+def _decode_html(content: bytes, content_type: str) -> str:
+    """
+    Decode page bytes using the charset the page declares.
+
+    Uses the Content-Type header's charset, else a <meta> charset in the
+    first 4 KiB, else UTF-8. Undecodable bytes become U+FFFD.
+    """
+    match = _CHARSET_RE.search(content_type or '')
+    if match:
+        charset = match.group(1)
+    else:
+        match = _META_CHARSET_RE.search(content[:4096])
+        charset = match.group(1).decode('ascii') if match else 'utf-8'
+
+    try:
+        return content.decode(charset, errors='replace')
+    except LookupError:
+        # Unknown charset name
+        return content.decode('utf-8', errors='replace')
+
+
+def _fetch_page_text(url: str) -> str:
+    """
+    Download a web page and extract its text, using the on-disk cache.
+
+    Cache keys use a hash of the URL so long URLs don't bloat the keyspace.
+    Raises on network or parse errors (failures are not cached).
+    """
+    key = ('page', hashlib.sha1(url.encode()).hexdigest())
+    text = _CACHE.get(key)
+    if text is not None:
+        return text
+
+    # Fetch page (session sends browser-like headers), reading at most
+    # MAX_PAGE_BYTES so huge pages don't get fully downloaded and parsed
+    with _SESSION.get(url, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        content = response.raw.read(MAX_PAGE_BYTES, decode_content=True)
+
+    if len(content) >= MAX_PAGE_BYTES:
+        logger.info("Truncated %s to the first %d bytes", url, MAX_PAGE_BYTES)
+
+    # Decode ourselves: reading response.raw skips requests' decoding, and
+    # lexbor would treat raw bytes as UTF-8 regardless of the declared charset
+    html = _decode_html(content, response.headers.get('Content-Type', ''))
+
+    # Parse HTML
+    tree = LexborHTMLParser(html)
+
+    # Remove non-content elements
+    for element in tree.css(_NON_CONTENT_SELECTOR):
+        element.decompose()
+
+    # Extract text, one line per block-level text node
+    tree.unwrap_tags(_INLINE_TAGS)
+    tree.merge_text_nodes()
+    root = tree.body or tree.root
+    text = root.text(separator='\n') if root else ''
+
+    # Clean up excessive whitespace
+    text = _BLANK_LINES_RE.sub('\n\n', text)
+    text = text.strip()
+
+    # Truncate if too long (keep first MAX_PAGE_TOKENS tokens)
+    text = _truncate_to_tokens(text, MAX_PAGE_TOKENS)
+
+    _CACHE.set(key, text, expire=CACHE_EXPIRE)
+    return text
+
+
 @tool
 def fetch_web_page(url: str) -> str:
     """
-    Fetch and parse a web page, converting HTML to clean readable text.
+    Fetch and parse a web page, extracting its clean readable text.
 
     Works with articles, blog posts, Substack pages, and most web content.
     Removes navigation, scripts, and other non-content elements.
@@ -179,7 +450,7 @@ def fetch_web_page(url: str) -> str:
         url: URL of the web page to fetch
 
     Returns:
-        Clean markdown-formatted text content of the page
+        Clean text content of the page, one block of text per line
     """
     try:
         # Validate URL
@@ -187,37 +458,7 @@ def fetch_web_page(url: str) -> str:
         if not parsed.scheme or not parsed.netloc:
             return f"Invalid URL: {url}"
 
-        # Fetch page with browser-like headers to avoid 403 errors
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Remove non-content elements
-        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
-            element.decompose()
-
-        # Convert to markdown
-        h = html2text.HTML2Text()
-        h.ignore_links = False
-        h.ignore_images = True
-        h.body_width = 0  # Don't wrap text
-
-        text = h.handle(str(soup))
-
-        # Clean up excessive whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = text.strip()
-
-        # Truncate if too long (keep first 10000 chars)
-        if len(text) > 20000:
-            text = text[:20000] + "\n\n[Content truncated...]"
-
-        return text
+        return _fetch_page_text(url)
 
     except requests.exceptions.RequestException as e:
         return f"Error fetching web page: {str(e)}"
@@ -229,6 +470,46 @@ def fetch_web_page(url: str) -> str:
 # WEB SEARCH
 # ============================================================================
 
+SERPER_URL = "https://google.serper.dev/search"
+
+# Upper bound on concurrent Serper requests issued by fact_check_claims
+MAX_CONCURRENT_SEARCHES = 5
+
+# Search results go stale faster than pages/transcripts
+SEARCH_CACHE_EXPIRE = 60 * 60  # seconds
+
+
+def _serper_search(query: str) -> dict:
+    """
+    Run a single Serper search and return the decoded JSON response.
+
+    Successful results are cached by normalized query (stripped, lowercased),
+    so repeated searches skip the API round-trip.
+    """
+    query = query.strip()
+    key = ('search', query.lower())
+    result = _CACHE.get(key)
+    if result is not None:
+        return result
+
+    payload = orjson.dumps({
+        "q": query,
+        "gl": "us"  # Using US for better fact-checking sources
+    })
+
+    headers = {
+        'X-API-KEY': os.getenv("SERPER_API_KEY"),
+        'Content-Type': 'application/json'
+    }
+
+    response = _SESSION.post(SERPER_URL, headers=headers, data=payload, timeout=30)
+    result = orjson.loads(response.content)
+
+    if response.ok:
+        _CACHE.set(key, result, expire=SEARCH_CACHE_EXPIRE)
+    return result
+
+
 @tool
 def better_web_search(query: str) -> dict:
     """
@@ -245,17 +526,34 @@ def better_web_search(query: str) -> dict:
         - organic: List of search results (title, link, snippet)
         - knowledgeGraph: Key information box (if available)
     """
-    url = "https://google.serper.dev/search"
+    return _serper_search(query)
 
-    payload = json.dumps({
-        "q": query,
-        "gl": "us"  # Using US for better fact-checking sources
-    })
 
-    headers = {
-        'X-API-KEY': os.getenv("SERPER_API_KEY"),
-        'Content-Type': 'application/json'
-    }
+@tool
+def fact_check_claims(claims: list[str]) -> dict:
+    """
+    Search for evidence on several claims at once using Serper API.
+
+    Prefer this over calling better_web_search in a loop: all searches run
+    concurrently, so checking 5 claims takes about as long as checking one.
+
+    Args:
+        claims: List of factual claims to verify
+
+    Returns:
+        Dictionary mapping each claim to its search results (same shape as
+        better_web_search), or to {"error": message} if that search failed
+    """
+    def search(claim):
+        try:
+            return _serper_search(claim)
+        except Exception as e:
+            return {"error": f"Search failed: {str(e)}"}
+
+    if not claims:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(len(claims), MAX_CONCURRENT_SEARCHES)) as executor:
+        results = list(executor.map(search, claims))
 
-    response = requests.post(url, headers=headers, data=payload)
-    return response.json()
+    return dict(zip(claims, results))